@@ -1,8 +1,33 @@
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain
+from heapq import nlargest
+from operator import attrgetter
+import hashlib
+import io
+import os
+import queue
+import re
 import sqlite3
+import threading
+
+import orjson
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional; sem ele vale o laço escalar
+    np = None
+
+try:
+    from numba import njit
+except ImportError:  # numba também é opcional
+    njit = None
 
 router = APIRouter()
 
@@ -11,53 +36,319 @@ DB_PATH = BASE_DIR / "data" / "live.sqlite"
 
 TABLES = ["processes1", "processes2", "processes3"]
 
-METRICS_INDEX = {
-    "timestramp": 0,
-    "usage_time": 1,
-    "delta_cpu_time": 2,
-    "cpu_usage": 3,
-    "rx_data": 4,
-    "tx_data": 5,
-}
+# tabela criada no upload com o blob Metrics já normalizado e indexado
+METRICS_TABLE = "metrics"
+
+COLUMNS = (
+    "timestramp", "uid", "package_name", "usage_time",
+    "delta_cpu_time", "cpu_usage", "rx_data", "tx_data",
+)
+
+class Record:
+    """Registro de métricas com __slots__: sem hash table por linha.
+
+    Com ~100k registros por resposta, dispensar o dict por registro corta
+    a memória por linha aproximadamente pela metade.
+    """
+    __slots__ = COLUMNS
+
+    def __init__(self, timestramp, uid, package_name, usage_time,
+                 delta_cpu_time, cpu_usage, rx_data, tx_data):
+        self.timestramp = timestramp
+        self.uid = uid
+        self.package_name = package_name
+        self.usage_time = usage_time
+        self.delta_cpu_time = delta_cpu_time
+        self.cpu_usage = cpu_usage
+        self.rx_data = rx_data
+        self.tx_data = tx_data
+
+    def as_dict(self) -> Dict:
+        return {c: getattr(self, c) for c in COLUMNS}
 
+# Pool de conexões de leitura reutilizadas entre requisições: evita pagar
+# abertura de fd e cache de páginas frio a cada chamada.
+POOL_SIZE = 5
+_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=POOL_SIZE)
+# geração do pool: reset_pool() incrementa, e conexões emprestadas durante um
+# upload (marcadas com a geração antiga) são fechadas em vez de devolvidas
+_pool_generation = 0
+
+def _configure(conn: sqlite3.Connection) -> None:
+    """PRAGMAs de leitura aplicados uma vez por conexão do pool.
+
+    journal_mode=WAL é definido no lado de escrita (upload), pois exige
+    acesso de escrita; aqui ficam só os ajustes por conexão.
+    """
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA cache_size=-65536;")       # 64 MiB de páginas quentes
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute("PRAGMA mmap_size=268435456;")     # leitura via mmap, sem read()
+
+class PooledConnection(sqlite3.Connection):
+    """Conexão do pool com espaço para caches por conexão (ex.: `_tables`)."""
+    _tables: frozenset
+    _generation: int
+    _db_ino: int
+
+def _new_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        f"file:{DB_PATH}?mode=ro&cache=shared",
+        uri=True,
+        check_same_thread=False,
+        factory=PooledConnection,
+    )
+    conn.row_factory = sqlite3.Row
+    _configure(conn)
+    # sqlite_master lido uma vez por conexão; o pool é esvaziado no upload,
+    # então conexões novas releem o esquema do banco substituído
+    conn._tables = frozenset(
+        r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table';")
+    )
+    conn._generation = _pool_generation
+    conn._db_ino = os.stat(DB_PATH).st_ino
+    return conn
+
+@contextmanager
 def connect():
     if not DB_PATH.exists():
         raise HTTPException(status_code=400, detail="Nenhum banco enviado. Use / (upload).")
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    return conn
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = _new_connection()
+    try:
+        yield conn
+    finally:
+        try:
+            db_ino = os.stat(DB_PATH).st_ino
+        except OSError:
+            db_ino = -1
+        # geração antiga OU inode trocado: a conexão atravessou um upload
+        # (mesmo uma aberta na janela entre o replace e o reset do pool)
+        # e aponta para o banco substituído — fecha em vez de devolver
+        if conn._generation != _pool_generation or conn._db_ino != db_ino:
+            conn.close()
+        else:
+            try:
+                _pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+def reset_pool() -> None:
+    """Fecha as conexões do pool; chamado após um novo upload substituir o banco."""
+    global _pool_generation
+    _pool_generation += 1
+    while True:
+        try:
+            _pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+# Executor de processos para o parse legado (bancos sem a tabela `metrics`):
+# uma tabela por worker contorna o GIL no trabalho de string. Criado no
+# startup do app (ver app/main.py); None = parse serial.
+_executor: Optional[ProcessPoolExecutor] = None
+
+def start_executor() -> None:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=len(TABLES))
+
+def stop_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+def _parse_table_records(
+    table: str,
+    start_ms: Optional[int],
+    end_ms: Optional[int],
+    package_name: Optional[str],
+    uid: Optional[str],
+) -> List["Record"]:
+    """Executado num worker: lê e parseia uma única tabela processes*."""
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    try:
+        cur = conn.execute(
+            _union_sql((table,), package_name is not None, uid is not None),
+            _filter_params(package_name, uid),
+        )
+        cur.arraysize = 1024
+        out: List[Record] = []
+        while rows := cur.fetchmany():
+            for pkg, uid_row, metrics in rows:
+                for rec in parse_metrics(metrics, pkg, uid_row):
+                    ts = rec.timestramp
+                    if (start_ms is None or ts >= start_ms) and (end_ms is None or ts <= end_ms):
+                        out.append(rec)
+        return out
+    finally:
+        conn.close()
+
+@lru_cache(maxsize=32)
+def _union_sql(tables: tuple, has_package: bool, has_uid: bool) -> str:
+    """Monta (uma vez por combinação tabelas×filtros) o UNION ALL filtrado.
+
+    O WHERE carrega apenas os filtros presentes: o padrão "? IS NULL OR ..."
+    não é sargável (o plano é fixado no prepare e o OR força SCAN), e
+    comparar a coluna Uid crua — em vez de CAST(Uid AS TEXT) — permite ao
+    planner usar os índices idx_pN_pkg_uid criados no upload.
+    """
+    preds = []
+    if has_package:
+        preds.append("PackageName = ?")
+    if has_uid:
+        preds.append("Uid = ?")
+    where = f" WHERE {' AND '.join(preds)}" if preds else ""
+    return " UNION ALL ".join(
+        # CAST no SELECT: o valor já chega como TEXT, sem str() por linha
+        f"SELECT PackageName, CAST(Uid AS TEXT) AS Uid, Metrics FROM {t}{where}"
+        for t in tables
+    )
+
+def _filter_params(package_name: Optional[str], uid: Optional[str]) -> tuple:
+    """Parâmetros na ordem do WHERE de `_union_sql`.
+
+    Uid é INT no esquema: uid numérico é convertido antes do bind para o
+    comparador casar o índice; valores não numéricos comparam como texto.
+    """
+    params = ()
+    if package_name is not None:
+        params += (package_name,)
+    if uid is not None:
+        try:
+            params += (int(uid),)
+        except ValueError:
+            params += (uid,)
+    return params
+
+def table_names(conn: sqlite3.Connection) -> frozenset:
+    names = getattr(conn, "_tables", None)
+    if names is None:  # conexão fora do pool: consulta o esquema na hora
+        cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        names = frozenset(r[0] for r in cur.fetchall())
+    return names
+
+def existing_tables(conn: sqlite3.Connection) -> List[str]:
+    names = table_names(conn)
+    return [t for t in TABLES if t in names]
+
+def _geti(v: str) -> Optional[int]:
+    try:
+        return int(v) if v else None
+    except ValueError:
+        return None
+
+def _getf(v: str) -> Optional[float]:
+    try:
+        return float(v) if v else None
+    except ValueError:
+        return None
+
+# blobs com menos chunks que isso não compensam o overhead do genfromtxt
+BULK_PARSE_MIN_CHUNKS = 32
+
+def _finalize_cpu(usage, dcpu, cpu):
+    """Aplica o fallback `delta_cpu_time / usage_time` e zera NaNs, in-place."""
+    for i in range(cpu.shape[0]):
+        if np.isnan(cpu[i]):
+            if not np.isnan(usage[i]) and usage[i] != 0.0 and not np.isnan(dcpu[i]):
+                cpu[i] = dcpu[i] / usage[i]
+            else:
+                cpu[i] = 0.0
+    return cpu
 
-def table_exists(conn: sqlite3.Connection, name: str) -> bool:
-    cur = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1;", (name,))
-    return cur.fetchone() is not None
+if njit is not None:
+    # laço escalar compilado para código de máquina; sem numba, a versão
+    # vetorizada abaixo é mais rápida que o laço interpretado
+    _finalize_cpu = njit(cache=True)(_finalize_cpu)
+else:
+    def _finalize_cpu(usage, dcpu, cpu):
+        fallback = np.isnan(cpu) & ~np.isnan(usage) & (usage != 0) & ~np.isnan(dcpu)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(fallback, dcpu / usage, np.nan_to_num(cpu))
 
-def parse_metrics(metrics: str, pkg: str, uid: str) -> List[Dict]:
+def _parse_metrics_bulk(metrics: str, pkg: str, uid: str) -> List[Record]:
+    """Decodifica todos os chunks de `metrics` de uma vez com NumPy.
+
+    Cada chunk vira uma linha de uma matriz (n, 6) float64; campos vazios
+    viram NaN. O fallback `delta_cpu_time / usage_time` é calculado
+    vetorizado, espelhando o laço escalar de `parse_metrics`.
+    """
+    lines = [c for c in metrics.split(";") if c.strip()]
+    data = np.atleast_2d(
+        np.genfromtxt(io.StringIO("\n".join(lines)), delimiter=":", dtype=np.float64)
+    )
+    if data.shape[1] != 6:
+        raise ValueError("chunks com número de campos variável")
+
+    ts, usage, dcpu, cpu, rx, tx = data.T
+    cpu = _finalize_cpu(usage, dcpu, np.ascontiguousarray(cpu))
+
+    usage = np.nan_to_num(usage).astype(np.int64)
+    dcpu = np.nan_to_num(dcpu).astype(np.int64)
+    rx = np.nan_to_num(rx).astype(np.int64)
+    tx = np.nan_to_num(tx).astype(np.int64)
+
+    out: List[Record] = []
+    for i in np.flatnonzero(~np.isnan(ts)):
+        out.append(Record(
+            int(ts[i]), str(uid), pkg, int(usage[i]),
+            int(dcpu[i]), float(cpu[i]), int(rx[i]), int(tx[i]),
+        ))
+    return out
+
+# Um chunk bem-formado inteiro numa única varredura DFA: 6 campos separados
+# por ":", delimitado por ";" ou pelas bordas do blob. Os grupos casam número
+# completo ou vazio, então int()/float() nunca levantam exceção.
+_INT = r"(-?\d+|)"
+_FLT = r"(-?(?:\d+\.?\d*|\.\d+)|)"
+_CHUNK_RE = re.compile(rf"(?<![^;])(-?\d+):{_INT}:{_INT}:{_FLT}:{_INT}:{_INT}(?=;|$)")
+
+def parse_metrics(metrics: str, pkg: str, uid: str) -> List[Record]:
     if not metrics:
         return []
-    out: List[Dict] = []
-    for chunk in (c for c in metrics.split(";") if c.strip() != ""):
-        parts = chunk.split(":")
+    if np is not None and metrics.count(";") >= BULK_PARSE_MIN_CHUNKS:
+        try:
+            return _parse_metrics_bulk(metrics, pkg, uid)
+        except ValueError:
+            pass  # formato inesperado: volta para o laço escalar
+    out: List[Record] = []
+    uid = str(uid)
+    for m in _CHUNK_RE.finditer(metrics):
+        g = m.group
+        usage = int(g(2)) if g(2) else None
+        dcpu  = int(g(3)) if g(3) else None
+        cpu   = float(g(4)) if g(4) else None
 
-        def geti(i: int) -> Optional[int]:
-            try:
-                v = parts[i]
-                return None if v == "" else int(v)
-            except (IndexError, ValueError):
-                return None
+        if cpu is None and usage and dcpu is not None:
+            cpu = float(dcpu) / float(usage)
 
-        def getf(i: int) -> Optional[float]:
-            try:
-                v = parts[i]
-                return None if v == "" else float(v)
-            except (IndexError, ValueError):
-                return None
-
-        ts   = geti(METRICS_INDEX["timestramp"])
-        usage= geti(METRICS_INDEX["usage_time"])
-        dcpu = geti(METRICS_INDEX["delta_cpu_time"])
-        cpu  = getf(METRICS_INDEX["cpu_usage"])
-        rx   = geti(METRICS_INDEX["rx_data"]) if "rx_data" in METRICS_INDEX else None
-        tx   = geti(METRICS_INDEX["tx_data"])
+        out.append(Record(
+            int(g(1)), uid, pkg, usage or 0,
+            dcpu or 0, cpu or 0.0,
+            int(g(5)) if g(5) else 0, int(g(6)) if g(6) else 0,
+        ))
+    if out:
+        return out
+    # nenhum chunk no layout canônico: tenta o parse campo a campo antigo
+    return _parse_metrics_ragged(metrics, pkg, uid)
+
+def _parse_metrics_ragged(metrics: str, pkg: str, uid: str) -> List[Record]:
+    out: List[Record] = []
+    for chunk in metrics.split(";"):
+        if not chunk.strip():
+            continue
+        parts = chunk.split(":")
+        n = len(parts)
+        ts    = _geti(parts[0])
+        usage = _geti(parts[1]) if n > 1 else None
+        dcpu  = _geti(parts[2]) if n > 2 else None
+        cpu   = _getf(parts[3]) if n > 3 else None
+        rx    = _geti(parts[4]) if n > 4 else None
+        tx    = _geti(parts[5]) if n > 5 else None
 
         if cpu is None and usage and usage != 0 and dcpu is not None:
             cpu = float(dcpu) / float(usage)
@@ -65,16 +356,10 @@ def parse_metrics(metrics: str, pkg: str, uid: str) -> List[Dict]:
         if ts is None:
             continue
 
-        out.append({
-            "timestramp": ts,
-            "uid": str(uid),
-            "package_name": pkg,
-            "usage_time": usage or 0,
-            "delta_cpu_time": dcpu or 0,
-            "cpu_usage": cpu or 0.0,
-            "rx_data": rx or 0,
-            "tx_data": tx or 0,
-        })
+        out.append(Record(
+            ts, str(uid), pkg, usage or 0,
+            dcpu or 0, cpu or 0.0, rx or 0, tx or 0,
+        ))
     return out
 
 def collect_processed(
@@ -84,47 +369,195 @@ def collect_processed(
     package_name: Optional[str] = None,
     uid: Optional[str] = None,
 ) -> List[Dict]:
-    results: List[Dict] = []
+    if not DB_PATH.exists():
+        raise HTTPException(status_code=400, detail="Nenhum banco enviado. Use / (upload).")
+    # mtime do arquivo entra na chave: um novo upload invalida o cache sozinho
+    cached = _collect_cached(
+        DB_PATH.stat().st_mtime_ns, start_ms, end_ms, limit, package_name, uid
+    )
+    # dicts só na borda de serialização (resposta do /upload-db)
+    return [rec.as_dict() for rec in cached]
+
+@lru_cache(maxsize=128)
+def _collect_cached(
+    db_mtime_ns: int,
+    start_ms: Optional[int],
+    end_ms: Optional[int],
+    limit: int,
+    package_name: Optional[str],
+    uid: Optional[str],
+) -> tuple:
     with connect() as conn:
-        for t in TABLES:
-            if not table_exists(conn, t):
-                continue
-            cur = conn.execute(f"SELECT PackageName, Uid, Pids, Metrics FROM {t}")
-            for row in cur:
-                pkg = row["PackageName"]
-                uid_row = str(row["Uid"])
-                if package_name and pkg != package_name:
-                    continue
-                if uid and uid_row != uid:
-                    continue
-                for rec in parse_metrics(row["Metrics"], pkg, uid_row):
-                    ts = rec["timestramp"]
-                    if (start_ms is None or ts >= start_ms) and (end_ms is None or ts <= end_ms):
-                        results.append(rec)
-                        if len(results) >= limit:
-                            results.sort(key=lambda x: x["timestramp"], reverse=True)
-                            return results
-    results.sort(key=lambda x: x["timestramp"], reverse=True)
-    return results
+        # bancos normalizados no upload têm a tabela `metrics` indexada:
+        # filtro, ordenação e limite viram um range scan de índice no SQLite
+        if METRICS_TABLE in table_names(conn):
+            return tuple(_query_normalized(conn, start_ms, end_ms, limit, package_name, uid))
+        tables = existing_tables(conn)
+        if _executor is None or len(tables) < 2:
+            # nlargest mantém apenas os `limit` registros mais novos num heap,
+            # em vez de materializar e ordenar todos os matches
+            return tuple(nlargest(
+                limit,
+                _iter_records(conn, start_ms, end_ms, package_name, uid),
+                key=attrgetter("timestramp"),
+            ))
+    # fan-out: uma tabela por worker, cada um com sua própria conexão
+    futures = [
+        _executor.submit(_parse_table_records, t, start_ms, end_ms, package_name, uid)
+        for t in tables
+    ]
+    return tuple(nlargest(
+        limit,
+        chain.from_iterable(f.result() for f in futures),
+        key=attrgetter("timestramp"),
+    ))
+
+@lru_cache(maxsize=16)
+def _normalized_sql(has_start: bool, has_end: bool,
+                    has_package: bool, has_uid: bool) -> str:
+    """WHERE montado só com os filtros presentes, pelo mesmo motivo de
+    `_union_sql`: predicados fixos deixam idx_m_ts servir o range + ORDER BY
+    e idx_m_pkg_uid servir os filtros de pacote/uid."""
+    preds = []
+    if has_start:
+        preds.append("ts >= ?")
+    if has_end:
+        preds.append("ts <= ?")
+    if has_package:
+        preds.append("package = ?")
+    if has_uid:
+        preds.append("uid = ?")
+    where = f" WHERE {' AND '.join(preds)}" if preds else ""
+    return (
+        "SELECT ts, uid, package, usage, dcpu, cpu, rx, tx FROM metrics"
+        f"{where} ORDER BY ts DESC LIMIT ?"
+    )
+
+def _query_normalized(
+    conn: sqlite3.Connection,
+    start_ms: Optional[int],
+    end_ms: Optional[int],
+    limit: int,
+    package_name: Optional[str],
+    uid: Optional[str],
+):
+    sql = _normalized_sql(start_ms is not None, end_ms is not None,
+                          package_name is not None, uid is not None)
+    params = tuple(p for p in (start_ms, end_ms, package_name, uid) if p is not None)
+    cur = conn.execute(sql, params + (limit,))
+    cur.arraysize = 1024
+    while rows := cur.fetchmany():
+        for r in rows:
+            yield Record(r[0], r[1], r[2], r[3], r[4], r[5], r[6], r[7])
+
+def _iter_records(
+    conn: sqlite3.Connection,
+    start_ms: Optional[int],
+    end_ms: Optional[int],
+    package_name: Optional[str],
+    uid: Optional[str],
+):
+    tables = existing_tables(conn)
+    if not tables:
+        return
+    params = _filter_params(package_name, uid) * len(tables)
+    # string estável -> sqlite3 reaproveita o prepared statement da conexão
+    cur = conn.execute(
+        _union_sql(tuple(tables), package_name is not None, uid is not None), params
+    )
+    cur.arraysize = 1024
+    while rows := cur.fetchmany():
+        for row in rows:
+            pkg = row["PackageName"]
+            for rec in parse_metrics(row["Metrics"], pkg, row["Uid"]):
+                ts = rec.timestramp
+                if (start_ms is None or ts >= start_ms) and (end_ms is None or ts <= end_ms):
+                    yield rec
+
+def columnar_response(
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+    limit: int = 1000,
+    package_name: Optional[str] = None,
+    uid: Optional[str] = None,
+    require_results: bool = False,
+    request: Optional[Request] = None,
+) -> Response:
+    """Resposta colunar para `/processes`: bytes do cache quando já
+    serializados, senão um StreamingResponse que emite o JSON coluna a
+    coluna e guarda o corpo no cache ao terminar."""
+    if not DB_PATH.exists():
+        raise HTTPException(status_code=400, detail="Nenhum banco enviado. Use / (upload).")
+    key = (DB_PATH.stat().st_mtime_ns, start_ms, end_ms, limit, package_name, uid)
+    cached = _json_cache.get(key)
+    if cached is not None:
+        body, etag, count = cached
+        if require_results and count == 0:
+            raise HTTPException(status_code=404, detail="Nenhum registro encontrado em data/live.sqlite")
+        if request is not None and request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+    items = _collect_cached(*key)
+    if require_results and not items:
+        raise HTTPException(status_code=404, detail="Nenhum registro encontrado em data/live.sqlite")
+    return StreamingResponse(_stream_columns(key, items), media_type="application/json")
+
+# corpo serializado + ETag por (mtime, filtros); preenchido pelo streaming.
+# Geradores de resposta rodam em threads do Starlette, então despejo e
+# inserção acontecem sob lock
+_JSON_CACHE_MAX = 128
+_json_cache: Dict[tuple, Tuple[bytes, str, int]] = {}
+_json_cache_lock = threading.Lock()
+
+def _stream_columns(key: tuple, items: tuple):
+    """Gera o JSON colunar coluna a coluna, sem montar o corpo inteiro antes
+    do primeiro byte; ao final, o corpo concatenado entra no cache para que
+    repetições sirvam bytes prontos com ETag."""
+    parts: List[bytes] = []
+    for i, col in enumerate(COLUMNS):
+        chunk = (b"{" if i == 0 else b",") + orjson.dumps(col) + b":" \
+            + orjson.dumps([getattr(rec, col) for rec in items])
+        parts.append(chunk)
+        yield chunk
+    parts.append(b"}")
+    yield b"}"
+    body = b"".join(parts)
+    entry = (body, f'"{hashlib.md5(body).hexdigest()}"', len(items))
+    with _json_cache_lock:
+        if len(_json_cache) >= _JSON_CACHE_MAX:
+            _json_cache.pop(next(iter(_json_cache)), None)
+        _json_cache[key] = entry
+
+def clear_result_cache() -> None:
+    """Descarta resultados memorizados; chamado após um novo upload."""
+    _collect_cached.cache_clear()
+    with _json_cache_lock:
+        _json_cache.clear()
 
 @router.get(
     "/processes",
     description="""
-    Lê os dados do banco `data/live.sqlite`, processa o campo `Metrics` e retorna um JSON estruturado contendo:
+    Lê os dados do banco `data/live.sqlite`, processa o campo `Metrics` e retorna um JSON colunar:
+    uma lista por campo, com o registro `i` espalhado pela posição `i` de cada lista.
 
-    - **timestramp**
-    - **uid**
-    - **package_name**
-    - **usage_time**
-    - **delta_cpu_time**
-    - **cpu_usage**
-    - **rx_data**
-    - **tx_data**
+    ```json
+    {
+        "timestramp": [...],
+        "uid": [...],
+        "package_name": [...],
+        "usage_time": [...],
+        "delta_cpu_time": [...],
+        "cpu_usage": [...],
+        "rx_data": [...],
+        "tx_data": [...]
+    }
+    ```
 
     Permite filtros por intervalo de tempo (`start_ms`, `end_ms`), pacote (`package_name`), UID e limite de resultados (`limit`).
     """
 )
-def processes(
+async def processes(
+    request: Request,
     start_ms: int = Query(..., description="timestramp inicial (ms)"),
     end_ms:   int = Query(..., description="timestramp final (ms)"),
     package_name: Optional[str] = Query(None),
@@ -133,28 +566,31 @@ def processes(
 ):
     if start_ms > end_ms:
         raise HTTPException(status_code=400, detail="start_ms deve ser <= end_ms")
-    items = collect_processed(start_ms=start_ms, end_ms=end_ms, limit=limit,
-                              package_name=package_name, uid=uid)
-    return JSONResponse(content=items)
+    # sqlite3 é síncrono: roda numa thread para não travar o event loop
+    return await asyncio.to_thread(
+        columnar_response, start_ms=start_ms, end_ms=end_ms, limit=limit,
+        package_name=package_name, uid=uid, request=request,
+    )
 
 @router.get(
     "/processes-latest",
     description="""
     Retorna apenas os registros mais recentes de cada aplicação/processo do banco `data/live.sqlite`,
-    já processados no formato JSON.  
+    já processados no mesmo formato JSON colunar de `/processes` (uma lista por campo).
     Útil para consultar o estado atual sem precisar especificar intervalos de tempo.
     """
 )
-def processes_latest(
+async def processes_latest(
+    request: Request,
     limit: int = Query(1000, ge=1, le=100_000),
     package_name: Optional[str] = Query(None),
     uid: Optional[str] = Query(None),
 ):
-    items = collect_processed(start_ms=None, end_ms=None, limit=limit,
-                              package_name=package_name, uid=uid)
-    if not items:
-        raise HTTPException(status_code=404, detail="Nenhum registro encontrado em data/live.sqlite")
-    return JSONResponse(content=items)
+    return await asyncio.to_thread(
+        columnar_response, start_ms=None, end_ms=None, limit=limit,
+        package_name=package_name, uid=uid,
+        require_results=True, request=request,
+    )
 
 @router.get(
     "/debug/tables",
@@ -165,8 +601,7 @@ def processes_latest(
     """
 )
 def debug_tables():
-    with sqlite3.connect(str(DB_PATH)) as conn:
-        conn.row_factory = sqlite3.Row
+    with connect() as conn:
         rows = conn.execute("SELECT name, sql FROM sqlite_master WHERE type='table'").fetchall()
         return [{"name": r["name"], "sql": r["sql"]} for r in rows]
 
@@ -178,12 +613,11 @@ def debug_tables():
     """
 )
 def debug_sample(limit: int = 3):
-    with sqlite3.connect(str(DB_PATH)) as conn:
-        conn.row_factory = sqlite3.Row
+    with connect() as conn:
         out = {}
         for t in ["processes1", "processes2", "processes3"]:
             try:
-                rows = conn.execute(f"SELECT PackageName, Uid, Pids, Metrics FROM {t} LIMIT ?", (limit,)).fetchall()
+                rows = conn.execute(f"SELECT PackageName, CAST(Uid AS TEXT) AS Uid, Pids, Metrics FROM {t} LIMIT ?", (limit,)).fetchall()
                 out[t] = [dict(r) for r in rows]
             except sqlite3.OperationalError:
                 out[t] = "tabela não encontrada"
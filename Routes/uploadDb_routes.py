@@ -1,9 +1,17 @@
 # Routes/uploadDb_routes.py
 from fastapi import APIRouter, UploadFile, File, HTTPException, Query
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import HTMLResponse
 from pathlib import Path
 from typing import Optional
-from Routes.processes_routes import collect_processed, DB_PATH  # reaproveita o coletor
+import asyncio
+import os
+import sqlite3
+
+import aiofiles
+from Routes.processes_routes import (  # reaproveita o coletor e o parser
+    collect_processed, parse_metrics, reset_pool, clear_result_cache,
+    DB_PATH, TABLES, METRICS_TABLE,
+)
 
 router = APIRouter()
 
@@ -11,6 +19,57 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+def create_indexes(db_path: Path) -> None:
+    """Cria índices em (PackageName, Uid) para cada tabela processes*.
+
+    Transforma os filtros SQL de `/processes` em busca por índice em vez de
+    varredura completa. Roda uma única vez por upload; tabelas ausentes são
+    ignoradas.
+    """
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        for i, t in enumerate(TABLES, start=1):
+            try:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_p{i}_pkg_uid ON {t}(PackageName, Uid);"
+                )
+            except sqlite3.OperationalError:
+                continue  # tabela não existe neste banco
+        conn.execute("ANALYZE;")
+
+def normalize_metrics(db_path: Path) -> None:
+    """Materializa o blob Metrics numa tabela `metrics` normalizada e indexada.
+
+    O parse acontece uma única vez, no upload; depois disso `/processes`
+    vira `SELECT ... WHERE ts BETWEEN ? AND ? ORDER BY ts DESC LIMIT ?`,
+    um range scan de índice em vez de reparse do blob a cada consulta.
+    """
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.execute(f"DROP TABLE IF EXISTS {METRICS_TABLE};")
+        conn.execute(
+            f"CREATE TABLE {METRICS_TABLE}("
+            "ts INTEGER, uid TEXT, package TEXT, usage INTEGER,"
+            "dcpu INTEGER, cpu REAL, rx INTEGER, tx INTEGER)"
+        )
+        conn.executemany(
+            f"INSERT INTO {METRICS_TABLE} VALUES (?,?,?,?,?,?,?,?)",
+            _iter_metric_tuples(conn),
+        )
+        conn.execute(f"CREATE INDEX idx_m_ts ON {METRICS_TABLE}(ts);")
+        conn.execute(f"CREATE INDEX idx_m_pkg_uid ON {METRICS_TABLE}(package, uid);")
+
+def _iter_metric_tuples(conn: sqlite3.Connection):
+    for t in TABLES:
+        try:
+            cur = conn.execute(f"SELECT PackageName, CAST(Uid AS TEXT) AS Uid, Metrics FROM {t}")
+        except sqlite3.OperationalError:
+            continue  # tabela não existe neste banco
+        for pkg, uid, metrics in cur.fetchall():
+            for rec in parse_metrics(metrics, pkg, uid):
+                yield (rec.timestramp, rec.uid, rec.package_name, rec.usage_time,
+                       rec.delta_cpu_time, rec.cpu_usage, rec.rx_data, rec.tx_data)
+
 @router.get(
     "/",
     response_class=HTMLResponse,
@@ -82,18 +141,45 @@ async def upload_db(
     if not file.filename.lower().endswith((".sqlite", ".db", ".sql")):
         raise HTTPException(status_code=400, detail="Envie um arquivo SQLite (.sqlite ou .db)")
 
-    data = await file.read()
-    with open(DB_PATH, "wb") as f:
-        f.write(data)
+    # grava em blocos de 1 MiB: memória constante e event loop livre,
+    # em vez de carregar o arquivo inteiro em RAM
+    tmp_path = DB_PATH.with_name(DB_PATH.name + ".tmp")
+    async with aiofiles.open(tmp_path, "wb") as f:
+        while chunk := await file.read(1 << 20):
+            await f.write(chunk)
     await file.close()
 
-    items = collect_processed(
+    # o banco anterior roda em WAL: além de trocar o arquivo principal é
+    # preciso descartar os sidecars -wal/-shm, que corromperiam o novo.
+    # os.replace dá um inode novo ao banco, então locks remanescentes de
+    # conexões antigas não atrapalham a reindexação abaixo
+    for suffix in ("-wal", "-shm"):
+        DB_PATH.with_name(DB_PATH.name + suffix).unlink(missing_ok=True)
+    os.replace(tmp_path, DB_PATH)
+
+    # invalida só DEPOIS da troca: uma conexão aberta antes do replace
+    # apontaria para o inode antigo e, com a geração já incrementada,
+    # voltaria ao pool servindo dados velhos
+    reset_pool()
+    clear_result_cache()
+
+    await asyncio.to_thread(create_indexes, DB_PATH)
+    await asyncio.to_thread(normalize_metrics, DB_PATH)
+
+    # conexões abertas durante a reindexação têm `_tables` sem `metrics` e
+    # ficariam presas ao caminho legado; invalida de novo para as próximas
+    # consultas enxergarem a tabela normalizada
+    reset_pool()
+    clear_result_cache()
+
+    items = await asyncio.to_thread(
+        collect_processed,
         start_ms=start_ms, end_ms=end_ms, limit=limit,
-        package_name=package_name, uid=uid
+        package_name=package_name, uid=uid,
     )
 
-    return JSONResponse(content={
+    return {
         "saved_as": str(DB_PATH),
         "count": len(items),
-        "results": items
-    })
+        "results": items,
+    }
@@ -1,12 +1,24 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pathlib import Path
 
 # importa as rotas
 from Routes.uploadDb_routes import router as update_router
-from Routes.processes_routes import router as processes_router
+from Routes.processes_routes import router as processes_router, start_executor, stop_executor
 
-app = FastAPI(title="Prova MOB - Consolidador de Processos")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # workers de parse (um por tabela) para bancos sem a tabela `metrics`
+    start_executor()
+    yield
+    stop_executor()
+
+app = FastAPI(
+    title="Prova MOB - Consolidador de Processos",
+    default_response_class=ORJSONResponse,  # serialização em C via orjson
+    lifespan=lifespan,
+)
 
 app.include_router(update_router, tags=["upload"])
 app.include_router(processes_router, tags=["processes"])